@@ -6,15 +6,51 @@ Created: 2019-08-03
 
 Tests for trending functions.
 """
+from fractions import Fraction
+
 from trending import trending
 
 
 def test_weight_summations():
     n = 10
-    p = 0.9
-    actual = sum(trending._decaying_weights(n, p))
-    expected = trending._geom_sum(p, n - 1)
-    assert abs(actual - expected) < 1e-6
+    for p in [0, 0.9, 1]:
+        actual = sum(trending._decaying_weights(n, p))
+        expected = trending._geom_sum(p, n - 1)
+        assert abs(actual - expected) < 1e-6
+
+    assert trending._geom_sum(0.3, 0) == 1
+
+    weights = list(trending._decaying_weights(4, 0.5))
+    assert weights == [1, 0.5, 0.25, 0.125]
+    assert list(trending._decaying_weights(0, 0.5)) == []
+
+
+def test_geom_sum_precision():
+    # 1 - r**(n + 1) loses about 7 significant digits here.
+    r = 0.999999999
+    n = 4
+    exact = (1 - Fraction(r)**(n + 1)) / (1 - Fraction(r))
+    actual = trending._geom_sum(r, n)
+    assert abs(actual - exact) / exact < 1e-15
+
+
+def test_recent_growths():
+    r = 0.9
+    series = [[1, 2, 3], [3, 2, 1], [4, 5, 6, 7], [1, 2, 3]]
+    actual = trending.recent_growths(series, r)
+    expected = [trending.recent_growth(a, r) for a in series]
+    assert actual == expected
+
+
+def test_zero_values():
+    assert trending.recent_growth([4, 5, 0], 0.5) == 0
+    for a in [[5, 0, 3, 0], [1, 0, 0], [1, 0, 2]]:
+        try:
+            trending.recent_growth(a, 0.5)
+        except ZeroDivisionError:
+            pass
+        else:
+            assert False, a
 
 
 def test_find_r():
@@ -25,6 +61,10 @@ def test_find_r():
     actual_frac = trending.compute_weight_frac(p, n)
     assert abs(actual_frac - frac) < 1e-3
 
+    p = trending.find_r(frac, n, 100, error_bound=error_bound)
+    actual_frac = trending.compute_weight_frac(p, n, 100)
+    assert abs(actual_frac - frac) < 1e-6
+
     assert trending.find_r(0.5, 5, 10) == 1
     assert trending.find_r(0.5, 5, 10) == 1
     assert trending.find_r(0.5, 5, 11) < 1
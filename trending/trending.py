@@ -20,31 +20,48 @@ Some notes on "notation":
   geometric series goes from 0 to n, meaning there are actually n + 1
   observations. So 1 must be subtracted before using this formula.
 """
-from functools import reduce
-from operator import mul
+from functools import lru_cache
+from itertools import accumulate, chain, repeat
+from math import exp, expm1, log
+from operator import mul, truediv
 
 
-def _compute_growth(a):
-    """Computes proportional growth between consecutive values in input list.
+def _decaying_weights(n, r):
+    """Computes weights that decay geometrically at rate r.
 
-    >>> _compute_growth([1, 2, 3, 4, 5])
-    [2.0, 1.5, 1.3333333333333333, 1.25]
+    Returns a one-shot iterator over n weights that run backwards in time,
+    starting with the most recent observation (which always has weight 1).
+    Weights are built up lazily by repeated multiplication instead of
+    computing each power of r separately.
     """
-    growth_list = [a[i] / a[i - 1] for i in range(1, len(a))]
-    return growth_list
-
+    if n == 0:
+        return iter([])
+    return chain([1], accumulate(repeat(r, n - 1), mul))
 
-def _geom_mean(growth_list, weights):
-    """Computes weighted geometric mean."""
-    weighted = [g**w for g, w in zip(growth_list, weights)]
-    gmean = reduce(mul, weighted)**(1 / sum(weights))
-    return gmean
 
+def _recent_growth(a, weights, weight_sum):
+    """Computes recent growth given weights and their sum.
 
-def _decaying_weights(n, r):
-    """Computes weights that decay geometrically at rate r."""
-    weights = [r**(n - i - 1) for i in range(n)]
-    return weights
+    `weights` runs backwards in time, as from `_decaying_weights`.
+    """
+    # Slicing makes two reversed copies of `a` so growth runs from the most
+    # recent obs. Growth and the weighted sum of its logs are then computed
+    # in a single pass, with map over operator functions keeping the
+    # per-element work in C.
+    reversed_a = a[::-1]
+    growth = map(truediv, reversed_a, reversed_a[1:])
+    weights = iter(weights)
+    # The most recent growth always has weight 1, and is the only one that
+    # can be 0: any earlier 0 in `a` is also a divisor, so the remaining
+    # growth values raise ZeroDivisionError before reaching log.
+    latest = next(growth)
+    next(weights)
+    log_sum = sum(map(mul, weights, map(log, growth)))
+    if latest == 0:
+        return 0.0
+    log_sum += log(latest)
+    gmean = exp(log_sum / weight_sum)
+    return gmean
 
 
 def recent_growth(a, r):
@@ -68,18 +85,57 @@ def recent_growth(a, r):
         raise Exception('input list `a` must have more than 1 value')
     if r < 0 or r > 1:
         raise Exception('`r` must be between 0 and 1 (inclusive)')
-    growth_list = _compute_growth(a)
-    weights = _decaying_weights(len(growth_list), r)
-    gmean = _geom_mean(growth_list, weights)
+    weights = _decaying_weights(len(a) - 1, r)
+    gmean = _recent_growth(a, weights, _geom_sum(r, len(a) - 2))
     return gmean
 
 
+def recent_growths(series, r):
+    """Computes recent growth for each of many series.
+
+    Equivalent to calling `recent_growth` on each series, but weights are
+    only computed once for each distinct series length.
+
+    Args:
+        series: List of lists of floats for which to compute recent growth
+        r: Float for decay rate. See `recent_growth`
+
+    Returns:
+        List of floats for weighted geometric mean of growth rates, in the
+        same order as `series`
+
+    >>> recent_growths([[5, 5, 5], [4, 5, 6]], r=0.8)
+    [1.0, 1.2219704337257924]
+    """
+    if r < 0 or r > 1:
+        raise Exception('`r` must be between 0 and 1 (inclusive)')
+    weights_by_n = {}
+    growths = []
+    for a in series:
+        if len(a) < 2:
+            raise Exception('each series must have more than 1 value')
+        n = len(a) - 1
+        if n not in weights_by_n:
+            weights = list(_decaying_weights(n, r))
+            weights_by_n[n] = (weights, _geom_sum(r, n - 1))
+        growths.append(_recent_growth(a, *weights_by_n[n]))
+    return growths
+
+
 def _geom_sum(r, n):
     """Computes sum of geometric series.
 
     Use n=float('inf') for infinite series.
     """
-    return (1 - r**(n + 1)) / (1 - r)
+    if r == 1:
+        return n + 1
+    if n == float('inf'):
+        return 1 / (1 - r)
+    if r == 0 or n == 0:
+        return 1
+    # Same as 1 - r**(n + 1), but without the cancellation error when r is
+    # close to 1.
+    return -expm1((n + 1) * log(r)) / (1 - r)
 
 
 def compute_weight_frac(r, last_n, total_n=None):
@@ -100,13 +156,15 @@ def compute_weight_frac(r, last_n, total_n=None):
     Returns:
         Float for fraction
     """
-    # n is inclusive in finite sum function so need to subtract 1.
     if total_n is None:
-        total_n = float('inf')
+        # Both sums share the 1 / (1 - r) factor, which cancels out.
+        return 1 - r**last_n
+    # n is inclusive in finite sum function so need to subtract 1.
     frac = _geom_sum(r, last_n - 1) / _geom_sum(r, total_n - 1)
     return frac
 
 
+@lru_cache(maxsize=1024)
 def find_r(frac, last_n, total_n=None, error_bound=1e-6):
     """Finds r s.t. the last n obs make up specified fraction of total weight.
 
@@ -122,21 +180,37 @@ def find_r(frac, last_n, total_n=None, error_bound=1e-6):
         Float for decay rate
 
     >>> find_r(0.5, 10)  # r such that last 10 obs make up 50% of total weight
-    0.9330339431762695
+    0.9330329915368074
     """
-    if total_n is not None and last_n / total_n >= frac:
+    if total_n is None:
+        # Weight fraction is 1 - r**last_n, which can be solved directly.
+        return (1 - frac)**(1 / last_n)
+    if last_n / total_n >= frac:
         return 1
 
+    # Uses the Illinois variant of regula falsi: the weight fraction is
+    # smooth and decreasing in r, so interpolating within the bracket
+    # converges much faster than bisection, and halving the stale endpoint's
+    # error whenever the same side moves twice keeps both ends closing in.
+    # The fraction is exactly 1 at r=0 and last_n / total_n at r=1.
     low, high = 0, 1
-    r = (low + high) / 2
-    test_frac = compute_weight_frac(r, last_n, total_n)
+    low_err, high_err = 1 - frac, last_n / total_n - frac
+    side = 0
     while high - low > error_bound:
-        test_frac = compute_weight_frac(r, last_n, total_n)
-        if test_frac > frac:
-            low = r
-        elif test_frac < frac:
-            high = r
+        r = (low * high_err - high * low_err) / (high_err - low_err)
+        if not low < r < high:
+            r = (low + high) / 2
+        err = compute_weight_frac(r, last_n, total_n) - frac
+        if err > 0:
+            low, low_err = r, err
+            if side == 1:
+                high_err /= 2
+            side = 1
+        elif err < 0:
+            high, high_err = r, err
+            if side == -1:
+                low_err /= 2
+            side = -1
         else:
             break
-        r = (low + high) / 2
     return r